@@ -0,0 +1,11 @@
+# agents/__init__.py
+# third-party modules the agents import lazily (on first use); app.py warms them
+# up after login and benchmarks/startup_report.py checks the login page avoids them
+HEAVY_MODULES = (
+    "google.generativeai",
+    "numpy",
+    "sklearn.metrics.pairwise",
+    "fitz",
+    "pytesseract",
+    "PIL.Image",
+)
@@ -1,7 +1,10 @@
 # ui/app.py
+import time
+_RUN_STARTED = time.perf_counter()
+_RUN_STARTED_TS = time.time()
+
 import streamlit as st
-import os, sys, json, datetime, base64, hashlib, tempfile
-import google.generativeai as genai
+import os, sys, json, datetime, base64, hashlib, tempfile, threading, importlib, contextlib
 
 # ---------------------------
 # Basic paths & environment
@@ -21,7 +24,7 @@ for p in (OUTPUT_DIR, PDF_DIR, USERS_DIR):
 # UI CSS (kept your styles)
 # ---------------------------
 st.set_page_config(page_title="📘 Hack Infinity", layout="wide")
-st.markdown("""
+APP_CSS = """
 <style>
 /* Your CSS (kept & cleaned) */
 html, body, [class*="css"]  {
@@ -43,27 +46,62 @@ html, body, [class*="css"]  {
 .stTextInput>div>div>input { background-color: rgba(255,255,255,0.08) !important; color: white !important; border-radius: 8px !important; border:1px solid rgba(255,255,255,0.2) !important; }
 .stTextInput>div>div>input:focus { border:1px solid #00d2ff !important; box-shadow:0 0 10px #00d2ff !important; }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# ---------------------------
+# Rerun latency budget
+# ---------------------------
+# Every widget interaction reruns this script; keep the server-side cost of a
+# single rerun (excluding Gemini/network calls) under this budget.
+RERUN_BUDGET_MS = 150
+RERUN_HISTORY = 50
+
+tracing = None  # agents.tracing, imported after login
+
+def record_rerun(page):
+    """Record this run's server-side time (minus Gemini waits) and show it in the sidebar."""
+    rerun_ms = (time.perf_counter() - _RUN_STARTED) * 1000
+    if tracing is not None:
+        # generate_content spans recorded by this script thread during this run
+        rerun_ms -= tracing.thread_total_ms(".generate_content", since=_RUN_STARTED_TS)
+    timings = st.session_state.setdefault("rerun_timings", {}).setdefault(page, [])
+    timings.append(rerun_ms)
+    del timings[:-RERUN_HISTORY]
+    if tracing is not None:
+        p95 = tracing.percentile(timings, 95)
+    else:
+        p95 = sorted(timings)[int(round(0.95 * (len(timings) - 1)))]  # same nearest rank as tracing.percentile
+    st.sidebar.caption(f"⏱️ rerun {rerun_ms:.0f} ms · p95 {p95:.0f} ms · budget {RERUN_BUDGET_MS} ms")
+    if p95 > RERUN_BUDGET_MS:
+        st.sidebar.caption(f"⚠️ {page} is over the {RERUN_BUDGET_MS} ms rerun budget")
+
+def stop_page(page):
+    """st.stop() for page bodies: record the rerun first, since st.stop skips the end of the script."""
+    record_rerun(page)
+    st.stop()
+
+# fragments let a widget rerun on its own instead of the whole page
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
 
 # ---------------------------
 # Load Gemini API key (from Streamlit secrets)
 # ---------------------------
-GEMINI_KEY = st.secrets.get("GEMINI_API_KEY", None)
+# same sources as agents.gemini_client.get_api_key, which does the actual configure
+GEMINI_KEY = st.secrets.get("GEMINI_API_KEY", None) or os.environ.get("GEMINI_API_KEY")
 GEN_MODEL = "models/gemini-2.5-flash"  # change if you prefer other family
 
-if GEMINI_KEY:
+@st.cache_resource(show_spinner=False)
+def get_gen_model(model_name):
+    """Build the Gemini model once per process and share it across sessions."""
     try:
+        from agents.gemini_client import get_model
+    except ImportError:
+        # agents package missing: configure directly with the same key
+        import google.generativeai as genai  # slow import: pay it on first use, not at startup
         genai.configure(api_key=GEMINI_KEY)
-        gen_model = genai.GenerativeModel(GEN_MODEL)
-        GEMINI_AVAILABLE = True
-    except Exception as e:
-        st.warning(f"Gemini init error: {e}")
-        gen_model = None
-        GEMINI_AVAILABLE = False
-else:
-    gen_model = None
-    GEMINI_AVAILABLE = False
-    st.warning("Gemini API key not found in secrets (GEMINI_API_KEY). Running with local fallbacks.")
+        return genai.GenerativeModel(model_name)
+    return get_model(model_name)
 
 # ---------------------------
 # Helper: base64 loader for background
@@ -79,43 +117,74 @@ def get_image_as_base64(file_path):
 # ---------------------------
 # Agents import (safe)
 # ---------------------------
-AGENTS_AVAILABLE = True
-try:
+@st.cache_resource(show_spinner=False)
+def load_agents():
+    """Import the agent modules once per process; an import error is raised, not cached."""
     from agents.reader import extract_text_from_pdf
     from agents.flashcard import generate_flashcards_from_text
     from agents.quiz import generate_quiz_from_text
     # chat_agent may provide a RAG pipeline; we'll prefer it if available.
     import agents.chat_agent as chat_agent_module
-    AGENTS_CHAT_AVAILABLE = hasattr(chat_agent_module, "answer_question")
-except Exception as e:
-    AGENTS_AVAILABLE = False
-    AGENTS_CHAT_AVAILABLE = False
-    # provide safe fallbacks so UI still displays
-    def extract_text_from_pdf(path):
-        return ["(local fallback) Could not read PDF — agents.reader missing."]
-    def generate_flashcards_from_text(text, n_cards=5):
-        # very small offline fallback
-        sents = [s for s in text.split(". ") if s.strip()]
-        cards = []
-        for i in range(min(n_cards, max(1, len(sents)//2))):
-            q = sents[2*i][:80] if 2*i < len(sents) else f"Q{i+1}?"
-            a = sents[2*i+1][:200] if 2*i+1 < len(sents) else "Answer hidden"
-            cards.append({"question": q, "answer": a})
-        return cards
-    def generate_quiz_from_text(text, n_questions=5):
-        return [{"question":"(fallback) No quiz generated","options":["A","B","C","D"],"answer":"A"}]
+    return (chat_agent_module,
+            extract_text_from_pdf, generate_flashcards_from_text, generate_quiz_from_text)
+
+@st.cache_resource(show_spinner=False)
+def load_summarizer():
+    """The summarizer is pure Python, so it stays available when the Gemini/NumPy agents fail to import."""
+    from agents.summarizer import summarize_text
+    return summarize_text
+
+def _warm_up():
+    # heavy dependencies the agents import lazily; warmed up in the background after login
+    try:
+        from agents import HEAVY_MODULES
+    except ImportError:
+        return
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """Start the warm-up thread once per process."""
+    t = threading.Thread(target=_warm_up, name="agents-warmup", daemon=True)
+    t.start()
+    return t
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def extract_pdf_cached(digest, _path, _misses=None):
+    """Extract a PDF once per document hash; ``_path``/``_misses`` are not part of the cache key."""
+    if _misses is not None:
+        _misses.append(digest)
+    return extract_text_from_pdf(_path)
+
+def extract_pdf(digest, path):
+    """extract_pdf_cached, tracing cache hits too (a miss is traced by the reader itself)."""
+    if not AGENTS_AVAILABLE:
+        return extract_text_from_pdf(path)  # don't cache the fallback's placeholder text
+    misses = []
+    start = time.perf_counter()
+    chunks = extract_pdf_cached(digest, path, misses)
+    if not misses and tracing is not None:
+        tracing.record_span("reader.extract_text_from_pdf", (time.perf_counter() - start) * 1000,
+                            bytes=os.path.getsize(path), cache_hit=True)
+    return chunks
 
 # ---------------------------
 # Single answer_question wrapper
 # ---------------------------
 def local_gemini_answer(query, context=None, max_tokens=600):
     """Call Gemini model with prompt; returns text or fallback error."""
-    if not GEMINI_AVAILABLE or gen_model is None:
+    if not GEMINI_AVAILABLE:
         return "⚠️ Gemini not available — no API key or init failed."
     # build prompt with optional context
     prompt = f"Context:\n{context if context else 'No context.'}\n\nQuestion:\n{query}\n\nAnswer the question concisely and clearly."
     try:
-        resp = gen_model.generate_content(prompt)
+        gen_model = get_gen_model(GEN_MODEL)
+        with (tracing.span("app.generate_content", prompt_chars=len(prompt)) if tracing else contextlib.nullcontext()):
+            resp = gen_model.generate_content(prompt)
         # .text or resp.text depending on package version
         text = getattr(resp, "text", None) or (resp and resp.to_dict().get("candidates",[{}])[0].get("content")) or str(resp)
         return text
@@ -179,7 +248,15 @@ def authenticate_user(username, password):
         return data
     return None
 
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _read_user_file(path, mtime_ns, size):
+    """Parse a user file for the leaderboard; cached until the file's mtime/size change."""
+    with open(path,"r",encoding="utf-8") as f:
+        return json.load(f)
+
 def load_user_data(username):
+    # not cached: update_xp_for_user writes back what this returns, and two saves
+    # within one mtime tick (coarse clocks, FAT, NFS) would hit a stale cache entry
     path = get_user_file(username)
     if not os.path.exists(path):
         return None
@@ -190,6 +267,7 @@ def save_user_data(username, data):
     path = get_user_file(username)
     with open(path,"w",encoding="utf-8") as f:
         json.dump(data,f,indent=2)
+    _read_user_file.clear()  # same-tick rewrites keep mtime/size; don't serve the old leaderboard entry
 
 XP_MAP = {"upload":10,"flashcards":15,"quiz":20,"accuracy_bonus":10,"planner":5,"summary":8}
 def update_xp_for_user(username, action):
@@ -330,6 +408,58 @@ if not st.session_state["current_user"]:
     login_ui(background_image_path="loginbg.jpeg")
     st.stop()
 
+# Everything below runs only after login, so the login screen imports nothing heavy.
+if st.secrets.get("WARMUP_MODELS", True):
+    start_warmup()
+
+# the model itself is built on the first question (see local_gemini_answer)
+GEMINI_AVAILABLE = bool(GEMINI_KEY)
+if not GEMINI_AVAILABLE:
+    st.warning("Gemini API key not found in secrets (GEMINI_API_KEY). Running with local fallbacks.")
+
+AGENTS_AVAILABLE = True
+try:
+    (chat_agent_module,
+     extract_text_from_pdf, generate_flashcards_from_text, generate_quiz_from_text) = load_agents()
+    AGENTS_CHAT_AVAILABLE = hasattr(chat_agent_module, "answer_question")
+except Exception:
+    # not cached: the import is retried on the next run instead of pinning these for the process
+    AGENTS_AVAILABLE = False
+    AGENTS_CHAT_AVAILABLE = False
+    chat_agent_module = None
+    # provide safe fallbacks so UI still displays
+    def extract_text_from_pdf(path):
+        return ["(local fallback) Could not read PDF — agents.reader missing."]
+    def generate_flashcards_from_text(text, n_cards=5):
+        # very small offline fallback
+        sents = [s for s in text.split(". ") if s.strip()]
+        cards = []
+        for i in range(min(n_cards, max(1, len(sents)//2))):
+            q = sents[2*i][:80] if 2*i < len(sents) else f"Q{i+1}?"
+            a = sents[2*i+1][:200] if 2*i+1 < len(sents) else "Answer hidden"
+            cards.append({"question": q, "answer": a})
+        return cards
+    def generate_quiz_from_text(text, n_questions=5):
+        return [{"question":"(fallback) No quiz generated","options":["A","B","C","D"],"answer":"A"}]
+
+try:
+    summarize_text = load_summarizer()  # an import error is not cached; retried next run
+except Exception:
+    def summarize_text(text, max_paragraphs=10):
+        st.warning("Summarizer unavailable — agents.summarizer missing.")
+        return []
+
+try:
+    from agents import tracing  # span ring buffer shown on the Diagnostics page
+except Exception:
+    tracing = None
+
+# usernames allowed to see the Diagnostics page: a list, or a comma-separated string
+_admins = st.secrets.get("ADMIN_USERS", [])
+if isinstance(_admins, str):
+    _admins = _admins.split(",")
+ADMIN_USERS = {u.strip() for u in _admins if u.strip()}
+
 # ---------------------------
 # Main app after login
 # ---------------------------
@@ -338,7 +468,31 @@ user_data = load_user_data(current_user) or st.session_state.get("user_data")
 st.sidebar.write(f"👤 {current_user}")
 
 st.sidebar.header("Navigation")
-page = st.sidebar.radio("Go to:", ["Dashboard","Upload Notes","Flashcards","Quiz","Revision Planner","Summarizer","Chatbot","View Saved Data"])
+pages = ["Dashboard","Upload Notes","Flashcards","Quiz","Revision Planner","Summarizer","Chatbot","View Saved Data"]
+if current_user in ADMIN_USERS:
+    pages.append("Diagnostics")
+page = st.sidebar.radio("Go to:", pages)
+
+# ---------------------------
+# Flashcard audio (fragment)
+# ---------------------------
+@st.cache_data(show_spinner=False, max_entries=256)
+def tts_mp3(text):
+    """Synthesize speech once per distinct text; returns the mp3 path."""
+    from gtts import gTTS
+    audio = gTTS(text=text, lang='en')
+    temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
+    audio.save(temp.name)
+    return temp.name
+
+@fragment
+def flashcard_audio(i, q, a):
+    # runs as a fragment: clicking Listen reruns only this button, not the page
+    if st.button(f"🔊 Listen Flashcard {i}", key=f"listen_{i}"):
+        try:
+            st.audio(tts_mp3(f"Question: {q}. Answer: {a}"))
+        except Exception as e:
+            st.error(f"TTS error: {e}")
 
 # ---------------------------
 # DASHBOARD
@@ -350,9 +504,10 @@ if page == "Dashboard":
     for fname in os.listdir(USERS_DIR):
         if fname.endswith(".json"):
             try:
-                with open(os.path.join(USERS_DIR,fname),"r",encoding="utf-8") as f:
-                    ud = json.load(f)
-                    leaderboard.append({"username":ud.get("username","?"),"xp":ud.get("xp",0),"level":ud.get("level",1),"streak":ud.get("streak",0)})
+                path = os.path.join(USERS_DIR,fname)
+                st_ = os.stat(path)
+                ud = _read_user_file(path, st_.st_mtime_ns, st_.st_size)
+                leaderboard.append({"username":ud.get("username","?"),"xp":ud.get("xp",0),"level":ud.get("level",1),"streak":ud.get("streak",0)})
             except Exception:
                 pass
     leaderboard = sorted(leaderboard, key=lambda x:x["xp"], reverse=True)[:10]
@@ -377,19 +532,24 @@ elif page == "Upload Notes":
     st.header("Upload your PDFs")
     uploaded_files = st.file_uploader("Upload PDFs", type=['pdf'], accept_multiple_files=True)
     if uploaded_files:
-        all_text = ""
-        for f in uploaded_files:
-            dest = os.path.join(PDF_DIR, f.name)
-            with open(dest,"wb") as out:
-                out.write(f.getbuffer())
-            st.info(f"Saved {f.name}")
-            chunks = extract_text_from_pdf(dest)
-            all_text += "\n".join(chunks) + "\n\n"
-        st.session_state['text'] = all_text
-        with open(os.path.join(OUTPUT_DIR,"extracted_text.txt"),"w",encoding="utf-8") as out:
-            out.write(all_text)
+        # the uploader keeps its files across reruns; only process a new selection
+        digests = [hashlib.sha256(f.getbuffer()).hexdigest() for f in uploaded_files]
+        upload_digest = hashlib.sha256("".join(digests).encode("utf-8")).hexdigest()
+        if st.session_state.get("upload_digest") != upload_digest:
+            all_text = ""
+            for f, digest in zip(uploaded_files, digests):
+                dest = os.path.join(PDF_DIR, f.name)
+                with open(dest,"wb") as out:
+                    out.write(f.getbuffer())
+                st.info(f"Saved {f.name}")
+                chunks = extract_pdf(digest, dest)
+                all_text += "\n".join(chunks) + "\n\n"
+            st.session_state['text'] = all_text
+            st.session_state['upload_digest'] = upload_digest
+            with open(os.path.join(OUTPUT_DIR,"extracted_text.txt"),"w",encoding="utf-8") as out:
+                out.write(all_text)
+            update_xp_for_user(current_user,"upload")
         st.success("Extraction complete")
-        update_xp_for_user(current_user,"upload")
 
 # ---------------------------
 # FLASHCARDS
@@ -398,7 +558,7 @@ elif page == "Flashcards":
     st.markdown("<h1 style='text-align:center;'>📘 Flashcards</h1>", unsafe_allow_html=True)
     if 'text' not in st.session_state or st.session_state['text'].strip() == "":
         st.warning("⚠️ Please upload notes first.")
-        st.stop()
+        stop_page(page)
 
     if st.button("✨ Generate Flashcards"):
         with st.spinner("Generating flashcards..."):
@@ -431,15 +591,7 @@ elif page == "Flashcards":
                 <div class='flash-a'>{a}</div>
             </div>
             """, unsafe_allow_html=True)
-            if st.button(f"🔊 Listen Flashcard {i}", key=f"listen_{i}"):
-                try:
-                    from gtts import gTTS
-                    audio = gTTS(text=f"Question: {q}. Answer: {a}", lang='en')
-                    temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-                    audio.save(temp.name)
-                    st.audio(temp.name)
-                except Exception as e:
-                    st.error(f"TTS error: {e}")
+            flashcard_audio(i, q, a)
             st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
 # ---------------------------
@@ -449,7 +601,7 @@ elif page == "Quiz":
     st.header("Quiz")
     if 'text' not in st.session_state or not st.session_state['text'].strip():
         st.warning("Upload notes first")
-        st.stop()
+        stop_page(page)
     if st.button("Generate Quiz"):
         try:
             quiz = generate_quiz_from_text(st.session_state['text'], n_questions=5)
@@ -467,13 +619,16 @@ elif page == "Quiz":
 
     if 'quiz' in st.session_state:
         user_answers, correct = [], []
-        for idx,q in enumerate(st.session_state['quiz'], start=1):
-            st.markdown(f"**Q{idx}:** {q.get('question')}")
-            opts = q.get('options', ["A","B","C","D"])
-            ans = st.radio(f"Choose for Q{idx}", opts, key=f"quiz_{idx}")
-            user_answers.append(ans)
-            correct.append(q.get('answer'))
-        if st.button("Submit Quiz"):
+        # a form batches the radio choices: picking an answer does not rerun the app
+        with st.form("quiz_form"):
+            for idx,q in enumerate(st.session_state['quiz'], start=1):
+                st.markdown(f"**Q{idx}:** {q.get('question')}")
+                opts = q.get('options', ["A","B","C","D"])
+                ans = st.radio(f"Choose for Q{idx}", opts, key=f"quiz_{idx}")
+                user_answers.append(ans)
+                correct.append(q.get('answer'))
+            submitted = st.form_submit_button("Submit Quiz")
+        if submitted:
             score = sum(1 for a,b in zip(user_answers, correct) if a==b)
             acc = (score/len(correct))*100 if correct else 0
             st.success(f"Score: {score}/{len(correct)} ({acc:.1f}%)")
@@ -491,8 +646,11 @@ elif page == "Revision Planner":
     today = datetime.date.today()
     plan = [{'Topic':t,'Revise On':str(today + datetime.timedelta(days=(i+1)*2))} for i,t in enumerate(topics)]
     st.table(plan)
-    save_json(plan,'planner.json')
-    update_xp_for_user(current_user,'planner')
+    # the plan only changes with the date: save and award XP once per day per session
+    if st.session_state.get("planner_saved_on") != str(today):
+        save_json(plan,'planner.json')
+        update_xp_for_user(current_user,'planner')
+        st.session_state["planner_saved_on"] = str(today)
 
 # ---------------------------
 # SUMMARIZER
@@ -501,15 +659,9 @@ elif page == "Summarizer":
     st.header("Summarizer")
     if 'text' not in st.session_state:
         st.warning("Upload notes first")
-        st.stop()
+        stop_page(page)
     if st.button("Generate Summary"):
-        paragraphs = st.session_state['text'].split('\n\n')
-        summaries=[]
-        for p in paragraphs[:10]:
-            p=p.strip()
-            if len(p)<80: continue
-            sents=p.split('. ')
-            summaries.append('. '.join(sents[:3]) + '.')
+        summaries = summarize_text(st.session_state['text'])
         st.session_state['summaries']=summaries
         save_json(summaries,'summaries.json')
         update_xp_for_user(current_user,'summary')
@@ -554,8 +706,37 @@ elif page == "View Saved Data":
             with open(os.path.join(OUTPUT_DIR,f),"r",encoding="utf-8") as fh:
                 st.text_area(f, fh.read()[:2000], height=200)
 
+# ---------------------------
+# DIAGNOSTICS (admins only)
+# ---------------------------
+elif page == "Diagnostics" and current_user in ADMIN_USERS:
+    st.header("🩺 Diagnostics")
+    if tracing is None:
+        st.info("Tracing unavailable — agents package could not be imported.")
+        stop_page(page)
+    st.subheader("Latency per stage")
+    rows = tracing.summarize()
+    if rows:
+        st.table(rows)
+    else:
+        st.info("No spans recorded yet.")
+    st.caption(f"Ring buffer: last {tracing.MAX_SPANS} spans for this server process.")
+    col1, col2 = st.columns(2)
+    col1.download_button("⬇️ Export spans (JSON lines)", tracing.export_jsonl(),
+                         file_name="spans.jsonl", mime="application/jsonl")
+    if col2.button("Clear spans"):
+        tracing.clear()
+        st.rerun()
+    st.subheader("Recent spans")
+    st.dataframe(tracing.get_spans()[-50:][::-1])
+
 # ---------------------------
 # sidebar footer
 # ---------------------------
 st.sidebar.markdown("---")
 st.sidebar.markdown("Hack Infinity — TEAM AXION")
+
+# ---------------------------
+# rerun latency (per page)
+# ---------------------------
+record_rerun(page)
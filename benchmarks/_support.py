@@ -0,0 +1,46 @@
+"""Shared helpers for the offline benchmark / diagnostics scripts."""
+import importlib.util
+import os
+import shutil
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def register_agents_package():
+    """Make the repo importable as ``agents`` (the name app.py imports it under)."""
+    if "agents" in sys.modules:
+        return sys.modules["agents"]
+    spec = importlib.util.spec_from_file_location(
+        "agents", os.path.join(REPO_DIR, "__init__.py"),
+        submodule_search_locations=[REPO_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["agents"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def rss_kib():
+    """Current resident set size of this process in KiB (None where it can't be read)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def copy_app(workdir):
+    """Copy app.py to ``workdir/ui/app.py`` and return its path.
+
+    app.py writes ``outputs/`` and ``uploads/`` next to its parent directory, so
+    running the copy keeps those writes inside ``workdir`` instead of above the repo.
+    """
+    ui_dir = os.path.join(workdir, "ui")
+    os.makedirs(ui_dir, exist_ok=True)
+    return shutil.copy(os.path.join(REPO_DIR, "app.py"), ui_dir)
@@ -0,0 +1,105 @@
+"""Deterministic, offline stand-in for ``google.generativeai``.
+
+Responses depend only on the prompt, so benchmark runs are repeatable:
+
+    with gemini_stub.installed(latency_s=0.2):
+        generate_quiz_from_text(text)
+"""
+import hashlib
+import json
+import re
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from ._support import register_agents_package
+
+
+class StubResponse:
+    def __init__(self, text, prompt):
+        self.text = text
+        # rough 4-chars-per-token estimate, same fields as the real usage_metadata
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=len(prompt) // 4,
+            candidates_token_count=len(text) // 4,
+        )
+
+
+class StubModel:
+    """Mimics ``genai.GenerativeModel``: ``generate_content`` sleeps, then answers."""
+
+    def __init__(self, model_name, latency_s=0.0):
+        self.model_name = model_name
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return StubResponse(_reply(prompt), prompt)
+
+
+def _count(prompt, default=5):
+    m = re.search(r"Generate (\d+)", prompt)
+    return int(m.group(1)) if m else default
+
+
+def _reply(prompt):
+    tag = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    if "flashcards" in prompt:
+        cards = [{"question": f"Q{i} [{tag}]?", "answer": f"Answer {i} [{tag}]."}
+                 for i in range(1, _count(prompt) + 1)]
+        return "```json\n" + json.dumps(cards) + "\n```"
+    if "MCQ" in prompt:
+        quiz = [{"question": f"Q{i} [{tag}]?", "options": ["A", "B", "C", "D"], "answer": "A"}
+                for i in range(1, _count(prompt) + 1)]
+        return json.dumps(quiz)
+    return f"Stub answer [{tag}] for a {len(prompt)}-char prompt."
+
+
+def make_genai(latency_s=0.0):
+    """A module-like object exposing ``configure`` and ``GenerativeModel``."""
+    return SimpleNamespace(
+        configure=lambda **kwargs: None,
+        GenerativeModel=lambda model_name, **kwargs: StubModel(model_name, latency_s),
+    )
+
+
+@contextmanager
+def installed(latency_s=0.0):
+    """Route all Gemini calls to the stub.
+
+    Covers the agents (via ``gemini_client``) and code that imports
+    ``google.generativeai`` directly, such as app.py.
+    """
+    register_agents_package()
+    from agents import gemini_client
+
+    stub = make_genai(latency_s)
+    previous = gemini_client._genai
+    saved_module = sys.modules.get("google.generativeai")
+    google = sys.modules.get("google")
+    saved_attr = getattr(google, "generativeai", None)
+
+    gemini_client._genai = stub
+    sys.modules["google.generativeai"] = stub
+    if google is None:
+        sys.modules["google"] = SimpleNamespace(generativeai=stub)
+    else:
+        google.generativeai = stub  # `import google.generativeai as x` reads the attribute
+    try:
+        yield stub
+    finally:
+        gemini_client._genai = previous
+        if saved_module is None:
+            sys.modules.pop("google.generativeai", None)
+        else:
+            sys.modules["google.generativeai"] = saved_module
+        if google is None:
+            sys.modules.pop("google", None)
+        elif saved_attr is None:
+            del google.generativeai
+        else:
+            google.generativeai = saved_attr
@@ -0,0 +1,357 @@
+"""Multi-session load test: simulated students driving app.py against the Gemini stub.
+
+Each student is a streamlit ``AppTest`` session going through
+
+    login -> Upload Notes -> Flashcards -> Quiz (generate + submit) -> Chatbot
+
+``AppTest`` is not safe to run concurrently inside one process: every run swaps
+the process-wide ``Runtime`` instance (and its cache storage), ``st.secrets`` and
+config, and restores them when it finishes, so parallel sessions in threads
+tear down each other's runtime and caches. The harness therefore runs each
+worker's students one after another in its own process and gets concurrency by
+running ``--sessions`` worker processes at once, all sharing one app copy and
+one ``outputs/`` directory.
+
+What the numbers mean:
+
+* latency / throughput: per-step wall time and flows/s with N students active at
+  the same time. Workers run on separate cores, so this is the best case for a
+  single ``streamlit run`` process, whose script runs share one GIL.
+* CPU s/flow: CPU time a worker spends per flow (app + harness), the basis for
+  the per-replica estimate: one Streamlit process ~ one core of Python work.
+* RSS: worker RSS once warm (``base``), RSS retained per student, and the
+  peak, so a server's footprint can be estimated as base + students x growth.
+
+Each worker first runs one warm-up student, left out of every statistic, so the
+one-time cost of importing the agents and their heavy dependencies (NumPy,
+scikit-learn, PyMuPDF) is not spread over ``--students-per-worker``.
+
+``AppTest`` cannot drive ``st.file_uploader``, so the Upload step runs the
+extraction the page runs (``agents.reader``) on a per-student synthetic PDF and
+puts the text in session state.
+
+Cross-session leaks are flagged when a student sees another student's data:
+the shared ``outputs/*.json`` files (across processes), or module state such as
+``chat_agent.CHUNKS`` still holding the previous student's notes when the next
+student in the same process starts. Because a process never runs two students
+at once, the race a real server has between concurrent script threads (one
+session's ``load_chunks`` landing between another's ``load_chunks`` and
+``answer_question``) is not exercised.
+
+    python -m benchmarks.loadtest --sessions 1 5 10 20 --latency-ms 800 --slo-ms 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import gemini_stub
+from ._support import REPO_DIR, copy_app, register_agents_package, rss_kib
+from .synthetic_pdf import make_pdf
+
+TARGET_CPU_UTIL = 0.7   # plan replicas to run at most this busy
+
+
+def _tag(idx):
+    return f"session{idx:03d}"
+
+
+def _rss_mib():
+    """(current, peak) RSS of this process in MiB; None where unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    peak = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    current = rss_kib()
+    current = current / 1024 if current is not None else peak
+    return round(current, 1), round(peak, 1)
+
+
+def _cpu_s():
+    try:
+        import resource
+    except ImportError:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _read_output(output_dir, name):
+    try:
+        with open(os.path.join(output_dir, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ------------------------
+# ONE SIMULATED STUDENT
+# ------------------------
+def run_session(idx, app_path, output_dir, pdf_path, loops, timeout, prev_tag=None, tag=None):
+    from streamlit.testing.v1 import AppTest
+
+    from agents import chat_agent
+    from agents.reader import extract_text_from_pdf
+
+    tag = tag or _tag(idx)
+    timings, leaks = [], []
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    at.secrets["GEMINI_API_KEY"] = "stub"
+    at.secrets["WARMUP_MODELS"] = False
+
+    def step(name, action):
+        start = time.perf_counter()
+        action()
+        timings.append((name, (time.perf_counter() - start) * 1000))
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+
+    def goto(page):
+        at.sidebar.radio[0].set_value(page).run()
+
+    def login():
+        at.run()
+        at.text_input(key="login_user").input(tag)
+        at.text_input(key="login_pass").input("loadtest")
+        _button(at, "Register").click().run()
+        _button(at, "Login").click().run()
+        if at.session_state["current_user"] != tag:
+            raise RuntimeError("login: not logged in")
+
+    def upload():
+        chunks = extract_text_from_pdf(pdf_path)
+        at.session_state["text"] = "\n".join(chunks) + "\n\n"
+        goto("Upload Notes")
+
+    def flashcards():
+        goto("Flashcards")
+        _button(at, "✨ Generate Flashcards").click().run()
+        if _read_output(output_dir, "flashcards.json") != at.session_state["flashcards"]:
+            leaks.append("outputs/flashcards.json holds another session's cards")
+
+    def quiz_generate():
+        goto("Quiz")
+        _button(at, "Generate Quiz").click().run()
+        if _read_output(output_dir, "quiz.json") != at.session_state["quiz"]:
+            leaks.append("outputs/quiz.json holds another session's quiz")
+
+    def quiz_submit():
+        _button(at, "Submit Quiz").click().run()
+
+    def chatbot():
+        goto("Chatbot")
+        next(t for t in at.text_input if t.label == "Ask your question").input(f"What does {tag} cover?").run()
+
+    try:
+        step("login", login)
+        # a fresh session must not see the previous student's notes in module state
+        if prev_tag and any(prev_tag in c for c in chat_agent.CHUNKS):
+            leaks.append("chat_agent.CHUNKS holds the previous session's notes (process-global state)")
+        for _ in range(loops):
+            for name, action in [("upload", upload), ("flashcards", flashcards),
+                                 ("quiz_generate", quiz_generate), ("quiz_submit", quiz_submit),
+                                 ("chatbot", chatbot)]:
+                step(name, action)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {"session": tag, "timings": timings, "leaks": leaks, "error": error}
+
+
+# ------------------------
+# ONE WORKER PROCESS
+# ------------------------
+def run_worker(worker_id, students, workdir, loops, pages, latency_s, timeout):
+    """Run ``students`` sessions back to back in this process (never concurrently)."""
+    register_agents_package()
+    import streamlit.testing.v1  # noqa: F401  (import cost is not part of the sessions)
+
+    app_path = os.path.join(workdir, "ui", "app.py")
+    output_dir = os.path.join(workdir, "outputs")
+    ids = [worker_id * students + j for j in range(students)]
+    pdfs = {i: make_pdf(os.path.join(workdir, f"{_tag(i)}.pdf"), pages=pages, seed=i, tag=_tag(i))
+            for i in ids}
+    warmup_tag = f"warmup{worker_id:03d}"
+    warmup_pdf = make_pdf(os.path.join(workdir, f"{warmup_tag}.pdf"), pages=pages, seed=-1 - worker_id,
+                          tag=warmup_tag)
+
+    results = []
+    with gemini_stub.installed(latency_s=latency_s):
+        # pays the agents' import cost; not part of any statistic
+        warmup = run_session(None, app_path, output_dir, warmup_pdf, 1, timeout, tag=warmup_tag)
+        if warmup["error"]:
+            raise RuntimeError(f"warm-up session: {warmup['error']}")
+        base_rss, _ = _rss_mib()
+        cpu_start = _cpu_s()
+        start_ts = time.time()
+        prev = warmup_tag
+        for i in ids:
+            results.append(run_session(i, app_path, output_dir, pdfs[i], loops, timeout, prev_tag=prev))
+            prev = _tag(i)
+        end_ts = time.time()
+        cpu_s = _cpu_s() - cpu_start
+    end_rss, peak_rss = _rss_mib()
+    return {
+        "worker": worker_id,
+        "start_ts": start_ts,
+        "end_ts": end_ts,
+        "cpu_s": cpu_s,
+        "base_rss_mib": base_rss,
+        "end_rss_mib": end_rss,
+        "peak_rss_mib": peak_rss,
+        "results": results,
+    }
+
+
+# ------------------------
+# ONE CONCURRENCY LEVEL
+# ------------------------
+def run_level(sessions, args):
+    """Start ``sessions`` worker processes at once against one shared app copy."""
+    register_agents_package()
+    from agents.tracing import percentile
+
+    with tempfile.TemporaryDirectory() as workdir:
+        copy_app(workdir)
+        cmd = [sys.executable, "-m", "benchmarks.loadtest", "--workdir", workdir,
+               "--students-per-worker", str(args.students_per_worker),
+               "--loops", str(args.loops), "--pages", str(args.pages),
+               "--latency-ms", str(args.latency_ms), "--timeout", str(args.timeout)]
+        procs = [subprocess.Popen(cmd + ["--worker", str(w)], cwd=REPO_DIR, text=True,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                 for w in range(sessions)]
+        workers, errors = [], []
+        for proc in procs:
+            out, err = proc.communicate()
+            if proc.returncode != 0:
+                lines = err.strip().splitlines()
+                errors.append(lines[-1] if lines else f"worker exit {proc.returncode}")
+                continue
+            workers.append(json.loads(out.strip().splitlines()[-1]))
+
+    if not workers:
+        return {"sessions": sessions, "errors": errors, "leaks": {}}
+
+    results = [r for w in workers for r in w["results"]]
+    wall = max(w["end_ts"] for w in workers) - min(w["start_ts"] for w in workers)
+    all_ms = [ms for r in results for _, ms in r["timings"]]
+    per_step = {}
+    for r in results:
+        for name, ms in r["timings"]:
+            per_step.setdefault(name, []).append(ms)
+    leaks = {}
+    for r in results:
+        for leak in r["leaks"]:
+            leaks[leak] = leaks.get(leak, 0) + 1
+    errors += [r["error"] for r in results if r["error"]]
+    flows = sum(1 for r in results if r["error"] is None) * args.loops
+    base = [w["base_rss_mib"] for w in workers if w["base_rss_mib"] is not None]
+    growth = [(w["end_rss_mib"] - w["base_rss_mib"]) / args.students_per_worker
+              for w in workers if w["base_rss_mib"] is not None]
+    peak = [w["peak_rss_mib"] for w in workers if w["peak_rss_mib"] is not None]
+    return {
+        "sessions": sessions,
+        "wall_s": round(wall, 2),
+        "flows": flows,
+        "flows_per_s": round(flows / wall, 2) if wall else None,
+        "steps_per_s": round(len(all_ms) / wall, 2) if wall else None,
+        "p50_ms": round(percentile(all_ms, 50), 1) if all_ms else None,
+        "p95_ms": round(percentile(all_ms, 95), 1) if all_ms else None,
+        "p99_ms": round(percentile(all_ms, 99), 1) if all_ms else None,
+        "step_p95_ms": {name: round(percentile(v, 95), 1) for name, v in per_step.items()},
+        "cpu_s_per_flow": round(sum(w["cpu_s"] for w in workers) / flows, 3) if flows else None,
+        "base_rss_mib": round(percentile(base, 50), 1) if base else None,
+        "rss_per_student_mib": round(percentile(growth, 50), 1) if growth else None,
+        "peak_rss_mib": round(max(peak), 1) if peak else None,
+        "errors": errors,
+        "leaks": leaks,
+    }
+
+
+# ------------------------
+# REPORT
+# ------------------------
+def print_report(levels, slo_ms, think_s):
+    print(f"{'sessions':>8} {'flows/s':>8} {'steps/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'CPU s/flow':>10} {'RSS base':>8} {'RSS/stu':>8} {'RSS peak':>8} {'errors':>6} {'leaks':>6}")
+    for lv in levels:
+        if "wall_s" not in lv:
+            print(f"{lv['sessions']:>8}  failed: {lv['errors'][0]}")
+            continue
+        print(f"{lv['sessions']:>8} {lv['flows_per_s']:>8} {lv['steps_per_s']:>8} {lv['p50_ms']:>8} "
+              f"{lv['p95_ms']:>8} {lv['p99_ms']:>8} {lv['cpu_s_per_flow'] or '-':>10} "
+              f"{lv['base_rss_mib'] or '-':>8} {lv['rss_per_student_mib'] or '-':>8} {lv['peak_rss_mib'] or '-':>8} "
+              f"{len(lv['errors']):>6} {sum(lv['leaks'].values()):>6}")
+    for lv in levels:
+        for leak, count in lv.get("leaks", {}).items():
+            print(f"  LEAK ({lv['sessions']} sessions, x{count}): {leak}")
+        for error in (lv["errors"][:3] if "wall_s" in lv else []):
+            print(f"  ERROR ({lv['sessions']} sessions): {error}")
+
+    ran = [lv for lv in levels if "wall_s" in lv]
+    ok = [lv["sessions"] for lv in ran
+          if not lv["errors"] and lv["p95_ms"] is not None and lv["p95_ms"] <= slo_ms]
+    print()
+    if ok:
+        print(f"Latency: p95 <= {slo_ms:.0f} ms held up to {max(ok)} concurrent students "
+              "(best case: workers ran on separate cores).")
+    else:
+        print(f"Latency: no tested level met p95 <= {slo_ms:.0f} ms without errors.")
+
+    cpu = [lv["cpu_s_per_flow"] for lv in ran if lv["cpu_s_per_flow"]]
+    if cpu:
+        cost = max(cpu)
+        students = int(TARGET_CPU_UTIL * think_s / cost)
+        line = (f"Capacity: ~{students} students per Streamlit process (one core at "
+                f"{TARGET_CPU_UTIL:.0%}), at {cost:.3f} CPU s per flow and one flow per {think_s:.0f} s")
+        mem = [lv for lv in ran if lv["base_rss_mib"] is not None and lv["rss_per_student_mib"] is not None]
+        if mem:
+            lv = mem[-1]
+            line += f"; ~{lv['base_rss_mib'] + students * lv['rss_per_student_mib']:.0f} MiB RSS"
+        print(line + ".")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10],
+                        help="concurrency levels (worker processes running at once)")
+    parser.add_argument("--students-per-worker", type=int, default=2,
+                        help="students each worker runs one after another")
+    parser.add_argument("--loops", type=int, default=1, help="page flows per student after login")
+    parser.add_argument("--pages", type=int, default=5, help="pages per synthetic PDF")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="simulated Gemini latency per call")
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest timeout per run (s)")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 step latency target")
+    parser.add_argument("--think-s", type=float, default=120.0,
+                        help="seconds a real student spends per flow, for the capacity estimate")
+    parser.add_argument("--json", metavar="PATH", help="also write the raw results here")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        result = run_worker(args.worker, args.students_per_worker, args.workdir, args.loops,
+                            args.pages, args.latency_ms / 1000, args.timeout)
+        print(json.dumps(result))
+        return 0
+
+    levels = [run_level(n, args) for n in args.sessions]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "levels": levels}, f, indent=2)
+    print_report(levels, args.slo_ms, args.think_s)
+    return 1 if any(lv.get("leaks") or lv.get("errors") for lv in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Offline benchmarks for the agent hot paths, compared against a stored baseline.
+
+Runs entirely locally: PDFs are generated on the fly and Gemini is replaced by
+the deterministic stub in ``benchmarks.gemini_stub``.
+
+    python -m benchmarks.run                     # compare with benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline   # record a new baseline
+    python -m benchmarks.run --pages 10 200 --image-ratio 0.5 --latency-ms 300
+
+Image-only pages should come back through OCR: an ``OCR GAP`` warning is printed
+when a PDF with image pages reports ``ocr_pages == 0`` (their OCR cost is then
+not being measured). Only regressions against the baseline set the exit code.
+
+tracemalloc only sees Python allocations; PyMuPDF allocates natively, so the
+extraction case also reports the process RSS growth while it runs.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from . import gemini_stub
+from ._support import register_agents_package, rss_kib
+from .synthetic_pdf import make_pdf
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25   # allowed slowdown / memory growth vs baseline
+MIN_DELTA_MS = 0.5         # ignore timing differences below this (noise)
+MIN_DELTA_KIB = 64
+MIN_DELTA_RSS_KIB = 1024
+
+
+# ------------------------
+# MEASUREMENT
+# ------------------------
+def peak_rss_growth_kib(fn, interval_s=0.002):
+    """Run ``fn`` while sampling RSS; return the peak growth over the starting RSS."""
+    start = rss_kib()
+    if start is None:
+        fn()
+        return None
+    peak = [start]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], rss_kib())
+            time.sleep(interval_s)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        fn()
+    finally:
+        done.set()
+        sampler.join()
+    peak[0] = max(peak[0], rss_kib())
+    return round(peak[0] - start, 1)
+
+
+def measure(fn, repeat, setup=None, rss=False):
+    """Time ``fn`` ``repeat`` times, then one extra run under tracemalloc for peak memory.
+
+    With ``rss`` a further run samples process RSS, for code that allocates natively.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times.sort()
+    median = statistics.median(times)
+    result = {
+        "median_ms": round(median, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+        "ops_per_s": round(1000 / median, 2) if median else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+    if rss:
+        if setup:
+            setup()
+        result["peak_rss_kib"] = peak_rss_growth_kib(fn)
+    return result
+
+
+def run_suite(pages_list, image_ratio, latency_s, repeat, workdir):
+    register_agents_package()
+    from agents import chat_agent
+    from agents.flashcard import generate_flashcards_from_text
+    from agents.quiz import generate_quiz_from_text
+    from agents.reader import extract_text_from_pdf
+    from agents.summarizer import summarize_text
+    from agents.tracing import get_spans
+
+    def reset_chunks():
+        chat_agent.LOADED_HASH = None
+
+    results = {}
+    with gemini_stub.installed(latency_s=latency_s):
+        for n in pages_list:
+            image_pages = int(round(n * image_ratio))
+            path = make_pdf(os.path.join(workdir, f"notes_{n}p.pdf"), pages=n, image_pages=image_pages, seed=n)
+            chunks = extract_text_from_pdf(path)
+            text = "\n".join(chunks) + "\n\n"   # what the Upload page stores
+
+            cases = {
+                "reader.extract_text_from_pdf": (lambda: extract_text_from_pdf(path), None),
+                "chat_agent.load_chunks": (lambda: chat_agent.load_chunks(text), reset_chunks),
+                "chat_agent.load_chunks.cached": (lambda: chat_agent.load_chunks(text), None),
+                "chat_agent.answer_question": (lambda: chat_agent.answer_question("Explain the transport process"), None),
+                "flashcard.generate_flashcards_from_text": (lambda: generate_flashcards_from_text(text, n_cards=6), None),
+                "quiz.generate_quiz_from_text": (lambda: generate_quiz_from_text(text, n_questions=5), None),
+                "summarizer.summarize_text": (lambda: summarize_text(text), None),
+            }
+            chat_agent.load_chunks(text)
+            for name, (fn, setup) in cases.items():
+                extraction = name == "reader.extract_text_from_pdf"
+                result = measure(fn, repeat, setup, rss=extraction)
+                if extraction:
+                    if result["median_ms"]:
+                        result["pages_per_s"] = round(n * 1000 / result["median_ms"], 1)
+                    result["image_pages"] = image_pages
+                    result["ocr_pages"] = get_spans("reader.extract_text_from_pdf")[-1].get("ocr_pages", 0)
+                results[f"{name}[{n}p]"] = result
+    return results
+
+
+def find_ocr_gaps(results):
+    """Extraction cases that had image-only pages but OCR'd none of them."""
+    return [name for name, r in results.items()
+            if r.get("image_pages") and not r.get("ocr_pages")]
+
+
+# ------------------------
+# BASELINE COMPARISON
+# ------------------------
+# (metric, label, noise floor)
+METRICS = [
+    ("median_ms", "time", MIN_DELTA_MS),
+    ("peak_kib", "mem", MIN_DELTA_KIB),
+    ("peak_rss_kib", "rss", MIN_DELTA_RSS_KIB),
+]
+
+
+def compare(results, baseline, tolerance):
+    """Return (rows, regressions) comparing time, traced memory and RSS per case."""
+    rows, regressions = [], []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, cur, None, "new"))
+            continue
+        problems = []
+        for key, label, floor in METRICS:
+            if cur.get(key) is None or base.get(key) is None:
+                continue
+            delta = cur[key] - base[key]
+            if delta > max(tolerance * base[key], floor):
+                problems.append(f"{label} +{delta / base[key]:.0%}" if base[key] else label)
+        status = "REGRESSION " + ", ".join(problems) if problems else "ok"
+        rows.append((name, cur, base, status))
+        if problems:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_rows(rows):
+    print(f"{'case':52} {'median ms':>10} {'base ms':>9} {'peak KiB':>9} {'base KiB':>9} {'RSS KiB':>9}  status")
+    for name, cur, base, status in rows:
+        b_ms = f"{base['median_ms']:9.3f}" if base else f"{'-':>9}"
+        b_kib = f"{base['peak_kib']:9.1f}" if base else f"{'-':>9}"
+        rss = cur.get("peak_rss_kib")
+        rss = f"{rss:9.1f}" if rss is not None else f"{'-':>9}"
+        print(f"{name:52} {cur['median_ms']:10.3f} {b_ms} {cur['peak_kib']:9.1f} {b_kib} {rss}  {status}")
+
+
+def print_ocr_gaps(results, gaps):
+    for name in gaps:
+        r = results[name]
+        print(f"warning: OCR GAP: {name}: {r['image_pages']} image-only page(s), {r['ocr_pages']} OCR'd "
+              "(tesseract missing? their text is dropped and OCR cost is not measured)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50], help="PDF sizes to benchmark")
+    parser.add_argument("--image-ratio", type=float, default=0.2, help="fraction of image-only pages")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated Gemini latency per call")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", metavar="PATH", help="also write the raw results here")
+    args = parser.parse_args(argv)
+
+    config = {"pages": args.pages, "image_ratio": args.image_ratio,
+              "latency_ms": args.latency_ms, "repeat": args.repeat}
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_suite(args.pages, args.image_ratio, args.latency_ms / 1000, args.repeat, workdir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+
+    gaps = find_ocr_gaps(results)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        print_rows([(name, cur, None, "baseline") for name, cur in results.items()])
+        print_ocr_gaps(results, gaps)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print_rows([(name, cur, None, "no baseline") for name, cur in results.items()])
+        print_ocr_gaps(results, gaps)
+        print("\nNo baseline found; run with --update-baseline to record one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    if stored.get("config") != config:
+        print(f"warning: baseline was recorded with {stored.get('config')}, running with {config}")
+    rows, regressions = compare(results, stored.get("results", {}), args.tolerance)
+    print_rows(rows)
+    print_ocr_gaps(results, gaps)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance.")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Cold-start report: import time per module and time to render the login page.
+
+Each measurement runs in a fresh interpreter so earlier imports don't hide the
+cost of later ones.
+
+    python -m benchmarks.startup_report [--json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+from ._support import REPO_DIR, copy_app, register_agents_package
+
+# third-party modules the app and agents depend on (the list app.py warms up)
+HEAVY_MODULES = list(register_agents_package().HEAVY_MODULES)
+AGENT_MODULES = [
+    "agents.gemini_client",
+    "agents.reader",
+    "agents.flashcard",
+    "agents.quiz",
+    "agents.chat_agent",
+]
+LOGIN_BUDGET_S = 1.0
+
+_IMPORT_PROBE = """
+import sys, time, json
+sys.path.insert(0, {repo!r})
+from benchmarks._support import register_agents_package
+register_agents_package()
+t = time.perf_counter()
+import {name}
+elapsed = time.perf_counter() - t
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_loaded": heavy}}))
+"""
+
+_LOGIN_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=30)
+at.run()
+elapsed = time.perf_counter() - t
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_loaded": heavy, "exception": bool(at.exception)}}))
+"""
+
+
+def _probe(code, cwd=REPO_DIR):
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=cwd)
+    if proc.returncode != 0:
+        err = proc.stderr.strip().splitlines()
+        return {"error": err[-1] if err else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_import(name):
+    return _probe(_IMPORT_PROBE.format(repo=REPO_DIR, name=name, heavy=HEAVY_MODULES))
+
+
+def measure_login():
+    with tempfile.TemporaryDirectory() as workdir:
+        app = copy_app(workdir)
+        return _probe(_LOGIN_PROBE.format(app=app, heavy=HEAVY_MODULES), cwd=workdir)
+
+
+def build_report():
+    report = {"imports": {}, "login": None}
+    for name in ["streamlit"] + HEAVY_MODULES + AGENT_MODULES:
+        report["imports"][name] = measure_import(name)
+    report["login"] = measure_login()
+    return report
+
+
+def print_report(report):
+    print(f"{'module':32} {'import s':>9}  heavy deps pulled in")
+    for name, r in report["imports"].items():
+        if "error" in r:
+            print(f"{name:32} {'-':>9}  ({r['error']})")
+            continue
+        heavy = ", ".join(m for m in r["heavy_loaded"] if m != name) or "-"
+        print(f"{name:32} {r['seconds']:9.3f}  {heavy}")
+    login = report["login"]
+    print()
+    if "error" in login:
+        print(f"login page: could not run ({login['error']})")
+        return
+    status = "OK" if login["seconds"] <= LOGIN_BUDGET_S and not login["heavy_loaded"] else "OVER BUDGET"
+    print(f"login page: {login['seconds']:.3f}s (budget {LOGIN_BUDGET_S:.1f}s) [{status}]")
+    if login["heavy_loaded"]:
+        print("  heavy modules imported by the login page: " + ", ".join(login["heavy_loaded"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+    report = build_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    login = report["login"]
+    return 0 if "error" not in login and not login["heavy_loaded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
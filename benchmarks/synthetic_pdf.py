@@ -0,0 +1,54 @@
+"""Synthetic study-note PDFs for the benchmarks (requires PyMuPDF).
+
+Text pages carry seeded pseudo-prose; image-only pages are the same kind of
+page rasterised into a picture, with no text layer, like a scanned handout.
+"""
+import random
+
+WORDS = (
+    "cell membrane protein enzyme energy reaction gradient transport molecule "
+    "structure function process system network signal pathway model theory "
+    "equation variable value rate change force motion field charge current "
+    "algorithm data memory cache thread queue graph tree node search sort"
+).split()
+
+
+def make_paragraph(rng, n_sentences=4):
+    sentences = []
+    for _ in range(n_sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+        sentences.append(" ".join(words).capitalize())
+    return ". ".join(sentences) + "."
+
+
+def make_page_text(rng, n_paragraphs=5, tag=None):
+    prefix = f"{tag} " if tag else ""
+    return "\n\n".join(prefix + make_paragraph(rng) for _ in range(n_paragraphs))
+
+
+def make_pdf(path, pages=10, image_pages=0, seed=0, dpi=72, tag=None):
+    """Write a PDF with ``pages`` pages, the last ``image_pages`` of them image-only.
+
+    ``tag`` is prepended to every paragraph so text can be traced back to its PDF.
+    """
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        text = make_page_text(rng, tag=tag)
+        page = doc.new_page()
+        box = page.rect + (50, 50, -50, -50)
+        if i < pages - image_pages:
+            page.insert_textbox(box, text, fontsize=10)
+            continue
+        # render the text on a scratch page, then paste only the picture
+        scratch = fitz.open()
+        src = scratch.new_page(width=page.rect.width, height=page.rect.height)
+        src.insert_textbox(box, text, fontsize=10)
+        pix = src.get_pixmap(dpi=dpi)
+        scratch.close()
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+    return path
@@ -1,8 +1,8 @@
-import google.generativeai as genai
 import json
 import re
 
-genai.configure(api_key="YOUR_API_KEY")
+from .gemini_client import get_model
+from .tracing import record_response, span
 
 MODEL = "models/gemini-2.5-flash"   # Confirmed working from your test
 
@@ -40,8 +40,10 @@ TEXT:
 """
 
     try:
-        model = genai.GenerativeModel(MODEL)
-        response = model.generate_content(prompt)
+        model = get_model(MODEL)
+        with span("quiz.generate_content", prompt_chars=len(prompt)) as s:
+            response = model.generate_content(prompt)
+            record_response(s, response)
 
         raw = response.text
         cleaned = clean_json(raw)
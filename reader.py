@@ -1,21 +1,34 @@
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
 import io
+import os
+
+from .tracing import span
 
 def extract_text_from_pdf(path, min_len=40):
     """Extracts clean text from both normal and scanned PDFs."""
-    doc = fitz.open(path)
-    full_text = ""
-    for i, page in enumerate(doc):
-        try:
-            txt = page.get_text("text")
+    with span("reader.extract_text_from_pdf", bytes=os.path.getsize(path)) as s:
+        import fitz  # PyMuPDF (imported on first use, it is slow to load)
+        doc = fitz.open(path)
+        full_text = ""
+        ocr_pages = ocr_failed = 0
+        for i, page in enumerate(doc):
+            try:
+                txt = page.get_text("text")
+            except Exception:
+                txt = ""
+            if not txt.strip():
+                # no text layer (scanned / image-only page): OCR the rendered page
+                try:
+                    import pytesseract
+                    from PIL import Image
+                    pix = page.get_pixmap()
+                    img = Image.open(io.BytesIO(pix.tobytes()))
+                    txt = pytesseract.image_to_string(img)
+                    ocr_pages += 1
+                except Exception:
+                    # pytesseract / tesseract not installed: skip the page as before
+                    ocr_failed += 1
             full_text += txt + "\n\n"
-        except Exception:
-            pix = page.get_pixmap()
-            img = Image.open(io.BytesIO(pix.tobytes()))
-            ocr_text = pytesseract.image_to_string(img)
-            full_text += ocr_text + "\n\n"
-    chunks = [c.strip() for c in full_text.split("\n\n") if len(c.strip()) >= min_len]
+        chunks = [c.strip() for c in full_text.split("\n\n") if len(c.strip()) >= min_len]
+        s.update(pages=len(doc), ocr_pages=ocr_pages, ocr_failed=ocr_failed,
+                 chars=len(full_text), chunks=len(chunks))
     return chunks
-print("✅ reader.py loaded successfully")
@@ -0,0 +1,16 @@
+# agents/summarizer.py
+from .tracing import span
+
+
+def summarize_text(text, max_paragraphs=10, min_len=80, n_sentences=3):
+    """Extractive summary: the first sentences of each substantial paragraph."""
+    with span("summarizer.summarize_text", chars=len(text)) as s:
+        summaries = []
+        for p in text.split('\n\n')[:max_paragraphs]:
+            p = p.strip()
+            if len(p) < min_len:
+                continue
+            sents = p.split('. ')
+            summaries.append('. '.join(sents[:n_sentences]) + '.')
+        s["summaries"] = len(summaries)
+    return summaries
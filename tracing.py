@@ -0,0 +1,116 @@
+# agents/tracing.py
+"""Lightweight in-process tracing for the agent hot paths.
+
+Spans are plain dicts kept in a bounded ring buffer (oldest dropped first):
+
+    with span("quiz.generate_content", prompt_chars=len(prompt)) as s:
+        resp = model.generate_content(prompt)
+        record_response(s, resp)
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 2000
+
+SPANS = deque(maxlen=MAX_SPANS)
+_LOCK = threading.Lock()
+
+
+# ------------------------
+# RECORDING
+# ------------------------
+@contextmanager
+def span(stage, **attrs):
+    """Time a block; extra keys set on the yielded dict are stored with the span."""
+    record = {"stage": stage, "ts": time.time(), "thread": threading.get_ident(), **attrs}
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        with _LOCK:
+            SPANS.append(record)
+
+
+def record_span(stage, duration_ms, **attrs):
+    """Store a span the caller timed itself, e.g. a cache lookup that skipped the traced code."""
+    record = {"stage": stage, "ts": time.time() - duration_ms / 1000, "thread": threading.get_ident(),
+              **attrs, "duration_ms": round(duration_ms, 3)}
+    with _LOCK:
+        SPANS.append(record)
+
+
+def record_response(record, resp):
+    """Copy payload size and token counts from a Gemini response onto a span."""
+    try:
+        text = resp.text or ""
+    except Exception:  # blocked / empty candidates raise on .text
+        text = ""
+    record["response_chars"] = len(text)
+    usage = getattr(resp, "usage_metadata", None)
+    if usage is not None:
+        record["tokens_in"] = getattr(usage, "prompt_token_count", None)
+        record["tokens_out"] = getattr(usage, "candidates_token_count", None)
+
+
+# ------------------------
+# READING / EXPORT
+# ------------------------
+def get_spans(stage=None):
+    with _LOCK:
+        spans = list(SPANS)
+    if stage is not None:
+        spans = [s for s in spans if s["stage"] == stage]
+    return spans
+
+
+def clear():
+    with _LOCK:
+        SPANS.clear()
+
+
+def thread_total_ms(stage_suffix, since):
+    """Total duration of the calling thread's ``*stage_suffix`` spans started at/after ``since``."""
+    me = threading.get_ident()
+    return sum(s["duration_ms"] for s in get_spans()
+               if s["thread"] == me and s["ts"] >= since and s["stage"].endswith(stage_suffix))
+
+
+def export_jsonl(path=None):
+    """Return the buffered spans as JSON lines (and write them to ``path`` if given)."""
+    data = "".join(json.dumps(s, default=str) + "\n" for s in get_spans())
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+    return data
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize():
+    """Per-stage count, p50/p95 duration, error count and cache-hit count."""
+    by_stage = {}
+    for s in get_spans():
+        by_stage.setdefault(s["stage"], []).append(s)
+    rows = []
+    for stage, spans in sorted(by_stage.items()):
+        durations = [s["duration_ms"] for s in spans]
+        rows.append({
+            "stage": stage,
+            "count": len(spans),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "errors": sum(1 for s in spans if "error" in s),
+            "cache_hits": sum(1 for s in spans if s.get("cache_hit")),
+        })
+    return rows